@@ -1,195 +1,565 @@
+import io
 import os
 import asyncio
 import logging
 import re
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from functools import partial
-from quart import Quart, jsonify, request
+from operator import methodcaller
+from quart import Quart, Response, jsonify, request
+from quart.json.provider import DefaultJSONProvider
 import usb1
 
-from adb_shell.adb_device import AdbDeviceUsb
+from adb_shell.adb_device import AdbDevice, AdbDeviceUsb
 from adb_shell.adb_device_async import AdbDeviceTcpAsync
 from adb_shell.transport.usb_transport import UsbTransport
 from adb_shell.exceptions import AdbConnectionError, AdbTimeoutError, UsbDeviceNotFoundError
 from adb_shell.auth.keygen import keygen
-from adb_shell.auth.sign_pythonrsa import PythonRSASigner
+from adb_shell.auth.sign_cryptography import CryptographySigner
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it the device encodes screenshots itself
+    Image = None
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional (and unavailable on Windows); fall back to the asyncio loop
+    uvloop = None
 
 # --- Basic Logging Setup ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 _LOGGER = logging.getLogger(__name__)
 
+# --- Transfer Settings ---
+TRANSFER_CHUNK_SIZE = 1 << 20  # 1 MiB
+MAX_UPLOAD_SIZE = 512 * 1024 * 1024  # 512 MiB
+# Content types for downloaded photos; anything else is sent as a generic binary
+_DOWNLOAD_CONTENT_TYPES = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png"}
+
+# --- USB Scan Cache ---
+USB_SCAN_CACHE_TTL = 2.0  # Seconds a USB bus scan is reused by /devices/usb and /connect
+
+# --- State Cache ---
+STATE_CACHE_TTL = 0.5  # Seconds a /state result is reused for back-to-back polls
+
+# Filter on the device so only the two lines we parse cross the ADB link
+_STATE_CMD = "dumpsys power | grep -E 'mWakefulness=|mScreenBrightnessSetting='"
+
+# --- Screenshot Settings ---
+# Raw `screencap` output starts with width, height and pixel format (little-endian uint32s)
+_SCREENCAP_HEADER = struct.Struct("<III")
+# Android pixel formats we can decode, mapped to the Pillow mode of the raw buffer
+# and the mode it is saved as (PNG has no RGBX, so its padding byte is dropped)
+_SCREENCAP_MODES = {
+    1: ("RGBA", "RGBA"),  # RGBA_8888
+    2: ("RGBX", "RGB"),   # RGBX_8888
+}
+
+# --- Parsing Patterns ---
+_WAKEFULNESS_RE = re.compile(r"mWakefulness=(\w+)")
+_BRIGHTNESS_RE = re.compile(r"mScreenBrightnessSetting=(\d+)")
+
+@dataclass(frozen=True)
+class _Connection:
+    """An open device client and whether it is the blocking USB one.
+
+    Both are swapped together by /connect, so a request always sees a matching pair.
+    """
+    client: object
+    is_usb: bool
+
 # --- Global State ---
 signer = None
-adb_client = None
-is_usb = False
+adb_conn = None
+adb_executor = None
+# The USB transport is a single stateful endpoint, so only one command may use it at a time
+adb_lock = asyncio.Lock()
+_state_cache = {"t": 0.0, "val": None, "gen": 0}
+_usb_scan_cache = {"t": 0.0, "val": None}
+_usb_serial_cache = {}
+# Connections whose raw framebuffer we could not decode, so /screenshot asks them for PNG directly
+_raw_screencap_unsupported = weakref.WeakSet()
+_state_lock = asyncio.Lock()
 
 # --- Helper Functions ---
 def _load_or_generate_keys():
-    """Load ADB keys from /data/adbkey, or generate them if they don't exist."""
+    """Load ADB keys from /data/adbkey, or generate them if they don't exist.
+
+    The key is parsed once into an OpenSSL-backed signer, so each auth handshake
+    signs with the cached key object instead of pure-Python RSA.
+    """
     adb_key_path = "/data/adbkey"
     if not os.path.exists(adb_key_path):
         _LOGGER.info("No ADB key found, generating a new one at %s", adb_key_path)
         os.makedirs("/data", exist_ok=True)
         keygen(adb_key_path)
-    _LOGGER.info("Loading ADB key from %s", adb_key_path)
-    with open(adb_key_path) as f:
-        priv = f.read()
-    with open(adb_key_path + ".pub") as f:
-        pub = f.read()
-    return PythonRSASigner(pub, priv)
+    _LOGGER.info("Loading ADB key from %s (cryptography signer)", adb_key_path)
+    return CryptographySigner(adb_key_path)
 
 async def _run_sync(func, *args, **kwargs):
-    """Run a synchronous (blocking) function in an executor."""
+    """Run a synchronous (blocking) function in the dedicated ADB executor."""
     loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, partial(func, *args, **kwargs))
+    return await loop.run_in_executor(adb_executor, partial(func, *args, **kwargs))
+
+async def _adb_run(*calls):
+    """Run `calls` in order against the connected device and return their results.
+
+    Each call takes the device client, e.g. ``methodcaller("shell", cmd)``. USB
+    calls block, so the whole sequence runs as one executor job under adb_lock;
+    network calls return coroutines that are awaited one after another.
+    """
+    # Read once so a concurrent /connect cannot swap the client mid-sequence
+    conn = adb_conn
+    if conn.is_usb:
+        async with adb_lock:
+            return await _run_sync(lambda: [call(conn.client) for call in calls])
+    return [await call(conn.client) for call in calls]
+
+async def _shell(command):
+    """Run a single shell command on the connected device."""
+    (result,) = await _adb_run(methodcaller("shell", command))
+    return result
+
+async def _exec_out(command):
+    """Run a command over the exec channel and return its raw output bytes."""
+    (result,) = await _adb_run(methodcaller("exec_out", command, decode=False))
+    return result
+
+def _spool_to_tempfile(stream):
+    """Copy an uploaded file stream to a temporary file on disk and return its path."""
+    with tempfile.NamedTemporaryFile(delete=False) as tmp:
+        shutil.copyfileobj(stream, tmp, length=TRANSFER_CHUNK_SIZE)
+    return tmp.name
+
+def _upload_source_path(stream):
+    """Return a local path ADB can push an uploaded stream from, and whether it is a temp copy.
+
+    Quart spools multipart uploads into an anonymous temporary file, which on Linux
+    can be reopened through /proc/self/fd so the push reads it without another copy.
+    """
+    try:
+        fd = stream.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return _spool_to_tempfile(stream), True
+    stream.flush()
+    fd_path = f"/proc/self/fd/{fd}"
+    if os.path.exists(fd_path):
+        return fd_path, False
+    return _spool_to_tempfile(stream), True
+
+class _PullSink(io.BytesIO):
+    """Pull destination that hands each chunk written by adb_shell to an asyncio.Queue.
+
+    adb_shell only pulls into a path or a BytesIO, so this subclasses BytesIO but
+    keeps nothing in its own buffer.
+    """
+
+    def __init__(self, loop, threaded):
+        super().__init__()
+        # The USB pull runs in the executor, where a bounded queue lets a slow client throttle it
+        self.queue = asyncio.Queue(maxsize=16 if threaded else 0)
+        self.aborted = False
+        self.threaded = threaded
+        self._loop = loop
+
+    def write(self, data):
+        if self.aborted:
+            raise ConnectionAbortedError("Download cancelled by client")
+        chunk = bytes(data)
+        if self.threaded:
+            asyncio.run_coroutine_threadsafe(self.queue.put(chunk), self._loop).result()
+        else:
+            self.queue.put_nowait(chunk)
+        return len(chunk)
+
+_PULL_DONE = object()
+
+def _abort_pull(sink, task):
+    """Stop a pull whose chunks are no longer wanted."""
+    if task.done():
+        return
+    sink.aborted = True
+    # Unblock a pull waiting on a full queue so its next write sees the abort
+    while not sink.queue.empty():
+        sink.queue.get_nowait()
+    # The USB pull runs on an executor thread and must finish by itself, since
+    # cancelling its task would release adb_lock while the thread still uses the device
+    if not sink.threaded:
+        task.cancel()
+
+async def _start_pull(remote_path):
+    """Start pulling a file from the device and return an async iterator over its chunks.
+
+    Waits for the first chunk so errors raised before any data arrives (such as a
+    missing file) propagate to the caller instead of truncating a streamed response.
+    """
+    conn = adb_conn
+    sink = _PullSink(asyncio.get_running_loop(), threaded=conn.is_usb)
+
+    async def _pull():
+        try:
+            if conn.is_usb:
+                async with adb_lock:
+                    await _run_sync(conn.client.pull, remote_path, sink)
+            else:
+                await conn.client.pull(remote_path, sink)
+            result = _PULL_DONE
+        except Exception as e:
+            result = e
+        if not sink.aborted:
+            await sink.queue.put(result)
+
+    task = asyncio.ensure_future(_pull())
+    try:
+        first = await sink.queue.get()
+    except BaseException:
+        # e.g. the handler was cancelled because the client disconnected
+        _abort_pull(sink, task)
+        raise
+    if isinstance(first, Exception):
+        raise first
+    chunks = _iter_pull(sink, task, first)
+    # The generator's finally only runs once iteration starts, so also abort
+    # if the response is discarded before Quart sends it
+    weakref.finalize(chunks, _abort_pull, sink, task)
+    return chunks
+
+async def _iter_pull(sink, task, item):
+    """Yield pulled chunks until the pull finishes, aborting it if the client goes away."""
+    try:
+        while item is not _PULL_DONE:
+            if isinstance(item, Exception):
+                _LOGGER.error("File download failed mid-transfer: %s", item)
+                raise item
+            yield item
+            item = await sink.queue.get()
+    finally:
+        _abort_pull(sink, task)
+
+def _scan_usb_devices():
+    """Return {serial: UsbTransport} for attached ADB devices, reusing a recent scan.
+
+    Each scan walks the whole bus, so results are kept for USB_SCAN_CACHE_TTL seconds.
+    Reading a serial string opens the device and issues a control transfer, so serials
+    are also remembered by bus number and device address, which stay fixed until the
+    device is unplugged (re-enumeration assigns a new address).
+    """
+    if _usb_scan_cache["val"] is not None and time.monotonic() - _usb_scan_cache["t"] < USB_SCAN_CACHE_TTL:
+        return _usb_scan_cache["val"]
+    devices, serials = {}, {}
+    try:
+        for dev in UsbTransport.find_all_adb_devices(default_transport_timeout_s=9.0):
+            key = (dev._device.getBusNumber(), dev._device.getDeviceAddress())
+            serial = _usb_serial_cache.get(key) or dev.serial_number
+            serials[key] = serial
+            devices[serial] = dev
+    except UsbDeviceNotFoundError:
+        devices, serials = {}, {}
+    # Keep only devices still attached so unplugged ones don't linger
+    _usb_serial_cache.clear()
+    _usb_serial_cache.update(serials)
+    _usb_scan_cache.update(t=time.monotonic(), val=devices)
+    return devices
+
+def _take_cached_usb_transport(serial):
+    """Take the transport for `serial` from a still-fresh USB scan, if there is one.
+
+    The whole scan is dropped rather than just this entry, so the transport is never
+    handed out twice and the next /devices/usb still lists the device.
+    """
+    devices = _usb_scan_cache["val"]
+    fresh = devices is not None and time.monotonic() - _usb_scan_cache["t"] < USB_SCAN_CACHE_TTL
+    _usb_scan_cache["val"] = None
+    return devices.get(serial) if fresh else None
+
+def _encode_screencap(raw):
+    """Encode raw `screencap` output as PNG, or return None if its layout is not recognized."""
+    if len(raw) < _SCREENCAP_HEADER.size:
+        return None
+    width, height, pixel_format = _SCREENCAP_HEADER.unpack_from(raw)
+    # Newer Android versions append a colour space field, making the header 16 bytes instead of 12
+    header_size = len(raw) - width * height * 4
+    if pixel_format not in _SCREENCAP_MODES or header_size not in (12, 16):
+        return None
+    raw_mode, png_mode = _SCREENCAP_MODES[pixel_format]
+    image = Image.frombuffer(raw_mode, (width, height), memoryview(raw)[header_size:], "raw", raw_mode, 0, 1)
+    if image.mode != png_mode:
+        image = image.convert(png_mode)
+    buf = io.BytesIO()
+    image.save(buf, "PNG", compress_level=1)
+    return buf.getvalue()
+
+def _invalidate_state_cache():
+    """Drop the cached /state result after anything that may have changed it."""
+    _state_cache["val"] = None
+    # Bumping the generation stops an in-flight /state poll from caching what it read before
+    _state_cache["gen"] += 1
 
 def _auth_callback_sync(device_client):
     """Log a message when auth is needed. This is only for sync (USB) connections."""
     _LOGGER.info("!!!!!! ACTION REQUIRED !!!!!! Please check your device's screen to 'Allow USB Debugging'.")
 
 # --- Quart Web Application ---
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that uses orjson's C encoder and decoder."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Quart(__name__)
+if orjson:
+    app.json = OrjsonProvider(app)
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_SIZE
+app.config["BODY_TIMEOUT"] = 300  # Large uploads can take a while on slow networks
 
 @app.before_serving
 async def startup():
-    """Initialize the ADB signer before starting the server."""
-    global signer
+    """Initialize the ADB executor and signer before starting the server."""
+    global signer, adb_executor
+    # A small, bounded pool keeps blocking USB calls isolated from other executor work
+    adb_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="adb-usb")
     signer = await _run_sync(_load_or_generate_keys)
     _LOGGER.info("Frameo ADB Server Initialized and ready for connection requests.")
 
+@app.after_serving
+async def shutdown():
+    """Shut down the ADB executor once the server stops."""
+    if adb_executor:
+        adb_executor.shutdown(wait=True)
+
+@app.before_request
+async def log_request():
+    """Log each incoming request once, at debug level to keep state polling quiet."""
+    _LOGGER.debug("Request received for %s", request.path)
+
 # --- API Endpoints ---
 @app.route("/devices/usb", methods=["GET"])
 async def get_usb_devices():
     """Scan for and return connected USB ADB devices."""
-    _LOGGER.info("Request received for /devices/usb")
     try:
-        devices = await _run_sync(UsbTransport.find_all_adb_devices)
-        serials = [dev.serial_number for dev in devices]
-        _LOGGER.info(f"Discovered USB devices: {serials}")
+        serials = list(await _run_sync(_scan_usb_devices))
+        _LOGGER.info("Discovered USB devices: %s", serials)
         return jsonify(serials)
     except UsbDeviceNotFoundError:
         _LOGGER.warning("No USB devices found during scan.")
         return jsonify([])
     except Exception as e:
-        _LOGGER.error(f"Error finding USB devices: {e}", exc_info=True)
+        _LOGGER.error("Error finding USB devices: %s", e, exc_info=True)
         return jsonify({"error": str(e)}), 500
 
 @app.route("/connect", methods=["POST"])
 async def connect_device():
     """Establishes and holds a connection to the device."""
-    global adb_client, is_usb
+    global adb_conn
     conn_details = await request.get_json()
     if not conn_details:
         return jsonify({"error": "Connection details not provided"}), 400
 
     conn_type = conn_details.get("connection_type", "USB").upper()
-    _LOGGER.info(f"Attempting to connect via {conn_type} with details: {conn_details}")
+    _LOGGER.info("Attempting to connect via %s with details: %s", conn_type, conn_details)
 
     try:
-        if adb_client:
-            await (_run_sync(adb_client.close) if is_usb else adb_client.close())
-            adb_client = None
+        if adb_conn:
+            await _adb_run(methodcaller("close"))
+            adb_conn = None
+            _invalidate_state_cache()
             _LOGGER.info("Closed existing connection before reconnecting.")
         
         if conn_type == "USB":
-            is_usb = True
             serial = conn_details.get("serial")
             if not serial:
                 return jsonify({"error": "USB connection requires a serial number."}), 400
             
-            # USB connection is synchronous, so we instantiate the sync class
-            adb_client = AdbDeviceUsb(serial=serial, default_transport_timeout_s=9.0)
-            await _run_sync(adb_client.connect, rsa_keys=[signer], auth_timeout_s=120.0, auth_callback=_auth_callback_sync)
+            # USB connection is synchronous, so we instantiate the sync class,
+            # reusing the transport from a recent /devices/usb scan when possible
+            transport = _take_cached_usb_transport(serial)
+            if transport:
+                client = AdbDevice(transport, default_transport_timeout_s=9.0)
+            else:
+                client = await _run_sync(AdbDeviceUsb, serial=serial, default_transport_timeout_s=9.0)
+            await _run_sync(client.connect, rsa_keys=[signer], auth_timeout_s=120.0, auth_callback=_auth_callback_sync)
+            adb_conn = _Connection(client, is_usb=True)
         
         else: # NETWORK
-            is_usb = False
             host = conn_details.get("host")
             port = int(conn_details.get("port", 5555))
             if not host:
                 return jsonify({"error": "Network connection requires a host."}), 400
             
             # TCP connection is asynchronous, so we can instantiate and use it directly
-            adb_client = AdbDeviceTcpAsync(host=host, port=port, default_transport_timeout_s=9.0)
-            await adb_client.connect(rsa_keys=[signer], auth_timeout_s=20.0)
+            client = AdbDeviceTcpAsync(host=host, port=port, default_transport_timeout_s=9.0)
+            await client.connect(rsa_keys=[signer], auth_timeout_s=20.0)
+            adb_conn = _Connection(client, is_usb=False)
 
-        _LOGGER.info(f"Successfully connected to device: {conn_details.get('serial') or conn_details.get('host')}")
+        _LOGGER.info("Successfully connected to device: %s", conn_details.get('serial') or conn_details.get('host'))
         return jsonify({"status": "connected"}), 200
 
     except (AdbConnectionError, AdbTimeoutError, UsbDeviceNotFoundError, usb1.USBError, ConnectionResetError) as e:
-        _LOGGER.error(f"Failed to connect to device: {e}")
-        adb_client = None
+        _LOGGER.error("Failed to connect to device: %s", e)
+        adb_conn = None
         return jsonify({"error": f"Connection failed: {e}"}), 500
     except Exception as e:
-        _LOGGER.error(f"An unexpected error occurred during connection: {e}", exc_info=True)
-        adb_client = None
+        _LOGGER.error("An unexpected error occurred during connection: %s", e, exc_info=True)
+        adb_conn = None
         return jsonify({"error": f"An unexpected error occurred: {e}"}), 500
 
 async def _shell_command(command):
     """Executes a shell command on the existing connection."""
-    global adb_client
+    global adb_conn
+
+    if not adb_conn or not adb_conn.client.available:
+        return {"error": "Device is not connected or available."}, 503
+    # /state polls this every few seconds, so keep it out of the info log
+    log = _LOGGER.debug if command == _STATE_CMD else _LOGGER.info
+    log("Executing shell command: '%s'", command)
+    try:
+        return await _shell(command), 200
+    except (AdbConnectionError, AdbTimeoutError, ConnectionResetError, usb1.USBError) as e:
+        _LOGGER.error("Shell command failed: %s. Connection may be lost.", e)
+        adb_conn = None
+        return {"error": str(e)}, 500
+
+async def _batch_shell_commands(commands):
+    """Executes several shell commands on the existing connection in a single pass."""
+    global adb_conn
 
-    if not adb_client or not adb_client.available:
+    if not adb_conn or not adb_conn.client.available:
         return {"error": "Device is not connected or available."}, 503
-    _LOGGER.info(f"Executing shell command: '{command}'")
+    _LOGGER.info("Executing batch of %d shell commands", len(commands))
     try:
-        if is_usb:
-            return await _run_sync(adb_client.shell, command), 200
-        return await adb_client.shell(command), 200
+        # Commands run in order, so later ones can depend on earlier ones
+        return await _adb_run(*(methodcaller("shell", command) for command in commands)), 200
     except (AdbConnectionError, AdbTimeoutError, ConnectionResetError, usb1.USBError) as e:
-        _LOGGER.error(f"Shell command failed: {e}. Connection may be lost.")
-        adb_client = None
+        _LOGGER.error("Batch shell command failed: %s. Connection may be lost.", e)
+        adb_conn = None
         return {"error": str(e)}, 500
 
+def _parse_state(response):
+    """Extract power state and brightness from `dumpsys power` output."""
+    wakefulness = _WAKEFULNESS_RE.search(response)
+    is_on = bool(wakefulness) and wakefulness.group(1) == "Awake"
+    brightness_match = _BRIGHTNESS_RE.search(response)
+    brightness = int(brightness_match.group(1)) if brightness_match else 0
+    return {"is_on": is_on, "brightness": brightness}
+
 @app.route("/state", methods=["POST"])
 async def get_state():
-    _LOGGER.info("Request received for /state")
-    response, status_code = await _shell_command("dumpsys power")
-    if status_code >= 400: return jsonify(response), status_code
-    
-    is_on = "mWakefulness=Awake" in response
-    brightness = 0
-    for line in response.splitlines():
-        if "mScreenBrightnessSetting=" in line:
-            try: brightness = int(line.split("=")[1]); break
-            except (ValueError, IndexError): pass
-    return jsonify({"is_on": is_on, "brightness": brightness})
+    # ?full=1 skips the cache and device-side filtering and includes the raw dump for diagnostics
+    if request.args.get("full"):
+        response, status_code = await _shell_command("dumpsys power")
+        if status_code >= 400: return jsonify(response), status_code
+        return jsonify({**_parse_state(response), "raw": response})
+
+    if _state_cache["val"] is not None and time.monotonic() - _state_cache["t"] < STATE_CACHE_TTL:
+        return jsonify(_state_cache["val"])
+
+    # Concurrent pollers wait here and share the result of a single dumpsys call
+    async with _state_lock:
+        if _state_cache["val"] is not None and time.monotonic() - _state_cache["t"] < STATE_CACHE_TTL:
+            return jsonify(_state_cache["val"])
+
+        gen = _state_cache["gen"]
+        response, status_code = await _shell_command(_STATE_CMD)
+        if status_code >= 400: return jsonify(response), status_code
+        
+        state = _parse_state(response)
+        if _state_cache["gen"] == gen:
+            _state_cache.update(t=time.monotonic(), val=state)
+    return jsonify(state)
 
 @app.route("/shell", methods=["POST"])
 async def run_shell_command():
     data = await request.get_json(); command = data.get("command")
     if not command: return jsonify({"error": "Command not provided"}), 400
+    _invalidate_state_cache()
     response, status_code = await _shell_command(command)
+    # Clear again afterwards in case a poll cached the old state while the command waited
+    _invalidate_state_cache()
     return jsonify({"result": response}), status_code
 
+@app.route("/batch-shell", methods=["POST"])
+async def run_batch_shell_commands():
+    """Runs a list of shell commands in order and returns their outputs."""
+    data = await request.get_json()
+    commands = data.get("commands") if isinstance(data, dict) else None
+    if not commands or not isinstance(commands, list) or not all(isinstance(c, str) and c for c in commands):
+        return jsonify({"error": "Commands must be a non-empty list of strings"}), 400
+    _invalidate_state_cache()
+    response, status_code = await _batch_shell_commands(commands)
+    # Clear again afterwards in case a poll cached the old state while the commands waited
+    _invalidate_state_cache()
+    if status_code >= 400: return jsonify(response), status_code
+    return jsonify({"results": response})
+
 @app.route("/tcpip", methods=["POST"])
 async def enable_tcpip():
     """Enables wireless debugging."""
-    if not is_usb or not adb_client or not adb_client.available:
+    if not adb_conn or not adb_conn.is_usb or not adb_conn.client.available:
         return jsonify({"error": "A USB connection is required for this action."}), 400
     
-    _LOGGER.info("Request received for /tcpip")
     try:
         port = 5555
-        await _run_sync(
-            adb_client._open, 
+        await _adb_run(methodcaller(
+            "_open",
             destination=f'tcpip:{port}'.encode('utf-8'),
             transport_timeout_s=None,
             read_timeout_s=10.0,
             timeout_s=None
-        )
+        ))
         
         return jsonify({"result": f"TCP/IP enabled on port {port}"}), 200
     except Exception as e:
-        _LOGGER.error(f"ADB Error on tcpip command: {e}")
+        _LOGGER.error("ADB Error on tcpip command: %s", e)
         return jsonify({"error": str(e)}), 500
 
+@app.route("/screenshot", methods=["GET"])
+async def take_screenshot():
+    """Capture the device screen and return it as a PNG image."""
+    if not adb_conn or not adb_conn.client.available:
+        return jsonify({"error": "Device is not connected or available."}), 503
+    
+    try:
+        # Fetch the raw framebuffer over the binary exec channel and encode the PNG
+        # on the host, sparing the frame's CPU; without Pillow the device encodes it.
+        conn = adb_conn
+        png = None
+        if Image and conn not in _raw_screencap_unsupported:
+            raw = await _exec_out("screencap")
+            png = await _run_sync(_encode_screencap, raw)
+            if png is None:
+                _LOGGER.info("Raw screencap format not supported, using device-side PNG encoding")
+                _raw_screencap_unsupported.add(conn)
+        if png is None:
+            png = await _exec_out("screencap -p")
+        
+        return Response(png, mimetype="image/png"), 200
+    
+    except Exception as e:
+        _LOGGER.error("Screenshot failed: %s", e)
+        return jsonify({"error": f"Screenshot failed: {str(e)}"}), 500
+
 @app.route("/upload", methods=["POST"])
 async def upload_file():
     """Upload a file to the device."""
-    if not adb_client or not adb_client.available:
+    if not adb_conn or not adb_conn.client.available:
         return jsonify({"error": "Device is not connected or available."}), 503
     
-    _LOGGER.info("Request received for /upload")
-    
     # Get file from request
     files = await request.files
     if 'file' not in files:
@@ -203,28 +573,22 @@ async def upload_file():
     form = await request.form
     destination = form.get('destination', '/sdcard/Frameo')
     
+    local_path, is_temp_copy = None, False
     try:
-        # Read file content
-        file_content = file.read()
         file_name = file.filename
         remote_path = f"{destination}/{file_name}"
         
-        _LOGGER.info(f"Uploading {file_name} to {remote_path}")
+        # Hand ADB a path to the spooled upload so it streams from disk
+        local_path, is_temp_copy = await _run_sync(_upload_source_path, file.stream)
         
-        # Push file to device
-        if is_usb:
-            await _run_sync(adb_client.push, file_content, remote_path)
-        else:
-            await adb_client.push(file_content, remote_path)
+        _LOGGER.info("Uploading %s to %s", file_name, remote_path)
         
-        _LOGGER.info(f"File uploaded successfully: {remote_path}")
-        
-        # Trigger media scan so photo appears in gallery
+        # Push the file and trigger a media scan so the photo appears in the gallery.
+        # Both steps run back-to-back in a single executor job on USB; the scan has to follow the push.
         scan_cmd = f"am broadcast -a android.intent.action.MEDIA_SCANNER_SCAN_FILE -d file://{remote_path}"
-        if is_usb:
-            await _run_sync(adb_client.shell, scan_cmd)
-        else:
-            await adb_client.shell(scan_cmd)
+        await _adb_run(methodcaller("push", local_path, remote_path), methodcaller("shell", scan_cmd))
+        
+        _LOGGER.info("File uploaded successfully: %s", remote_path)
         
         return jsonify({
             "status": "success",
@@ -233,17 +597,18 @@ async def upload_file():
         }), 200
     
     except Exception as e:
-        _LOGGER.error(f"File upload failed: {e}", exc_info=True)
+        _LOGGER.error("File upload failed: %s", e)
         return jsonify({"error": f"Upload failed: {str(e)}"}), 500
+    finally:
+        if is_temp_copy:
+            os.remove(local_path)
 
 @app.route("/download", methods=["POST"])
 async def download_file():
     """Download a file from the device."""
-    if not adb_client or not adb_client.available:
+    if not adb_conn or not adb_conn.client.available:
         return jsonify({"error": "Device is not connected or available."}), 503
     
-    _LOGGER.info("Request received for /download")
-    
     data = await request.get_json()
     if not data or 'path' not in data:
         return jsonify({"error": "No path provided"}), 400
@@ -251,30 +616,38 @@ async def download_file():
     remote_path = data['path']
     
     try:
-        _LOGGER.info(f"Downloading file from {remote_path}")
+        _LOGGER.info("Downloading file from %s", remote_path)
         
-        # Pull file from device
-        if is_usb:
-            file_content = await _run_sync(adb_client.pull, remote_path)
-        else:
-            file_content = await adb_client.pull(remote_path)
+        # Stream chunks to the client as ADB delivers them instead of buffering the whole file
+        chunks = await _start_pull(remote_path)
         
         # Return file as response
-        from quart import Response
-        import os
         filename = os.path.basename(remote_path)
+        content_type = _DOWNLOAD_CONTENT_TYPES.get(os.path.splitext(filename)[1].lower(), 'application/octet-stream')
         
-        return Response(
-            file_content,
-            mimetype='application/octet-stream',
+        response = Response(
+            chunks,
+            mimetype=content_type,
             headers={
                 'Content-Disposition': f'attachment; filename="{filename}"'
             }
-        ), 200
+        )
+        # The pull runs while the body is sent, so RESPONSE_TIMEOUT would cut large files short
+        response.timeout = None
+        return response, 200
     
     except Exception as e:
-        _LOGGER.error(f"File download failed: {e}", exc_info=True)
+        _LOGGER.error("File download failed: %s", e)
         return jsonify({"error": f"Download failed: {str(e)}"}), 500
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=False)
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    # Serve through Hypercorn directly rather than Quart's development server, on uvloop where available
+    config = Config()
+    config.bind = ["0.0.0.0:5000"]
+    if uvloop and sys.platform != "win32":
+        uvloop.run(serve(app, config))
+    else:
+        asyncio.run(serve(app, config))
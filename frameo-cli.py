@@ -3,88 +3,174 @@
 Frameo CLI - Command-line interface for Frameo ADB Control API
 
 Usage:
-    frameo-cli connect usb <serial>
-    frameo-cli connect network <host> [--port <port>]
-    frameo-cli devices
-    frameo-cli state
-    frameo-cli shell <command>
-    frameo-cli tcpip
-    frameo-cli wake
-    frameo-cli sleep
-    frameo-cli brightness <level>
-    frameo-cli tap <x> <y>
-    frameo-cli swipe <x1> <y1> <x2> <y2> [--duration <ms>]
-    frameo-cli next
-    frameo-cli prev
-    frameo-cli home
-    frameo-cli back
-    frameo-cli open-app
-    frameo-cli restart-app
-    frameo-cli screenshot [--output <file>]
-    frameo-cli upload <file> [--destination <path>]
-    frameo-cli download <remote-path> [--output <file>]
-    frameo-cli info
-    frameo-cli --help
-    frameo-cli --version
+    frameo-cli [--host <host>] [--port <port>] <command> [<args>...]
+
+Commands:
+    connect usb <serial>
+    connect network <host> [--port <port>]
+    devices
+    state
+    shell <command>
+    tcpip
+    wake
+    sleep
+    brightness <level>
+    tap <x> <y>
+    swipe <x1> <y1> <x2> <y2> [--duration <ms>]
+    next
+    prev
+    home
+    back
+    open-app
+    restart-app
+    screenshot [--output <file>]
+    upload <file> [--destination <path>]
+    download <remote-path> [--output <file>]
+    info
+    batch <script>
 
 Options:
     --host <host>           API server host [default: localhost]
     --port <port>           API server port [default: 5000]
-    --duration <ms>         Swipe duration in milliseconds [default: 300]
-    --output <file>         Output file path [default: screenshot.png]
-    --destination <path>    Destination directory on device [default: /sdcard/Frameo]
     -h --help               Show this help message
     --version               Show version
 """
 
+import argparse
 import sys
 import json
 import os
-import requests
-from docopt import docopt
-from typing import Optional, Dict, Any
+import stat
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+# requests and requests-toolbelt are imported by _import_http() only once a command needs them
+requests = None
+MultipartEncoder = None
 
 VERSION = "1.0.0"
 DEFAULT_API_HOST = "localhost"
 DEFAULT_API_PORT = 5000
+STREAM_CHUNK_SIZE = 64 * 1024
+ENDPOINTS = ("/devices/usb", "/connect", "/state", "/shell", "/batch-shell", "/tcpip",
+             "/screenshot", "/upload", "/download")
+
+# (connect, read) timeouts in seconds, so a dead socket fails fast instead of hanging
+REQUEST_TIMEOUT = (3.05, 30)
+TRANSFER_TIMEOUT = (3.05, 300)
+CONNECT_TIMEOUT = (3.05, 150)  # The server waits up to 120s for the USB auth prompt to be accepted
+EXIT_TIMEOUT = 124  # Distinct exit code so scripts can tell a timeout apart and retry
+
+FRAMEO_PACKAGE = "com.frameo.app"
+OPEN_APP_CMD = f"am start -n {FRAMEO_PACKAGE}/.MainActivity"
+# Stop, wait up to 2s for the process to exit, and start again in one device-side shell
+RESTART_APP_CMD = "; ".join([
+    f"am force-stop {FRAMEO_PACKAGE}",
+    "i=0",
+    f"while pidof {FRAMEO_PACKAGE} >/dev/null && [ $i -lt 20 ]; do sleep 0.1; i=$((i+1)); done",
+    OPEN_APP_CMD,
+])
+JSON_HEADERS = {"Content-Type": "application/json"}
+# Percentage shown for each 0-255 brightness level
+BRIGHTNESS_PERCENT = tuple(int(level / 255 * 100) for level in range(256))
+
+
+@lru_cache(maxsize=64)
+def _shell_body(command: str) -> bytes:
+    """Encode the /shell request body for a command, once per distinct command"""
+    body = {"command": command}
+    return orjson.dumps(body) if orjson else json.dumps(body).encode()
+
+
+def _import_http():
+    """Import the HTTP libraries on first use, so --help and --version start without them"""
+    global requests, MultipartEncoder
+    import requests
+    try:
+        from requests_toolbelt.multipart.encoder import MultipartEncoder
+    except ImportError:  # requests-toolbelt is optional; fall back to requests' in-memory multipart encoding
+        MultipartEncoder = None
 
 
 class FrameoCLI:
     """Frameo CLI client"""
     
     def __init__(self, host: str = DEFAULT_API_HOST, port: int = DEFAULT_API_PORT):
+        _import_http()
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
         self.base_url = f"http://{host}:{port}"
+        # Full URLs are built once rather than on every request
+        self._urls = {endpoint: f"{self.base_url}{endpoint}" for endpoint in ENDPOINTS}
         self.session = requests.Session()
-        self.session.headers.update({"Content-Type": "application/json"})
+        # Keep a small pool of persistent connections to the single API host. Read timeouts
+        # are not retried, so they surface as Timeout (exit 124) instead of ConnectionError
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=Retry(total=2, read=False, backoff_factor=0.1))
+        self.session.mount("http://", adapter)
     
-    def _request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict[Any, Any]:
-        """Make HTTP request to API"""
-        url = f"{self.base_url}{endpoint}"
+    def _request(self, method: str, endpoint: str, data: Union[Dict, bytes, None] = None,
+                 timeout=REQUEST_TIMEOUT, parse_json: bool = True) -> Optional[Dict[Any, Any]]:
+        """Make HTTP request to API, returning the parsed body unless parse_json is False"""
+        url = self._urls[endpoint]
         try:
             if method == "GET":
-                response = self.session.get(url)
+                response = self.session.get(url, timeout=timeout)
+            elif method == "POST" and isinstance(data, bytes):
+                # Body is already encoded JSON
+                response = self.session.post(url, data=data, headers=JSON_HEADERS, timeout=timeout)
             elif method == "POST":
-                response = self.session.post(url, json=data)
+                response = self.session.post(url, json=data, timeout=timeout)
             else:
                 raise ValueError(f"Unsupported method: {method}")
             
             response.raise_for_status()
-            return response.json()
+            if not parse_json:
+                return None
+            return orjson.loads(response.content) if orjson else response.json()
+        except requests.exceptions.Timeout:
+            self._exit_timeout()
         except requests.exceptions.ConnectionError:
             self._error(f"Cannot connect to API at {self.base_url}")
             self._error("Make sure the Frameo API server is running")
             sys.exit(1)
         except requests.exceptions.HTTPError as e:
-            try:
-                error_data = response.json()
-                self._error(f"API Error: {error_data.get('error', str(e))}")
-            except:
-                self._error(f"HTTP Error: {e}")
-            sys.exit(1)
+            self._exit_http_error(response, e, "API Error")
         except Exception as e:
             self._error(f"Unexpected error: {e}")
             sys.exit(1)
     
+    def _exit_http_error(self, response: "requests.Response", error: Exception, prefix: str):
+        """Report an HTTP error, with the API's error message when the body is JSON, and exit"""
+        # Skip parsing HTML or plain-text error pages from proxies and the like
+        if response.headers.get("Content-Type", "").startswith("application/json"):
+            try:
+                self._error(f"{prefix}: {response.json().get('error', str(error))}")
+                sys.exit(1)
+            except (ValueError, AttributeError):
+                pass
+        self._error(f"HTTP Error: {error}")
+        sys.exit(1)
+    
+    def _exit_timeout(self):
+        """Report a timed-out request and exit with EXIT_TIMEOUT"""
+        self._error(f"Request to API at {self.base_url} timed out")
+        sys.exit(EXIT_TIMEOUT)
+    
+    def _stream_to_file(self, response: "requests.Response", output: str) -> int:
+        """Write a streamed response body to a file chunk by chunk and return its size"""
+        total = 0
+        with response, open(output, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                f.write(chunk)
+                total += len(chunk)
+        return total
+    
     def _success(self, message: str):
         """Print success message"""
         print(f"✓ {message}")
@@ -99,7 +185,10 @@ class FrameoCLI:
     
     def _print_json(self, data: Dict):
         """Pretty print JSON data"""
-        print(json.dumps(data, indent=2))
+        if orjson:
+            print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
+        else:
+            print(json.dumps(data, indent=2))
     
     def get_usb_devices(self):
         """Get list of USB devices"""
@@ -118,7 +207,7 @@ class FrameoCLI:
             "connection_type": "USB",
             "serial": serial
         }
-        result = self._request("POST", "/connect", data)
+        self._request("POST", "/connect", data, timeout=CONNECT_TIMEOUT, parse_json=False)
         self._success(f"Connected to USB device: {serial}")
     
     def connect_network(self, host: str, port: int = 5555):
@@ -128,7 +217,7 @@ class FrameoCLI:
             "host": host,
             "port": port
         }
-        result = self._request("POST", "/connect", data)
+        self._request("POST", "/connect", data, timeout=CONNECT_TIMEOUT, parse_json=False)
         self._success(f"Connected to network device: {host}:{port}")
     
     def get_state(self):
@@ -138,7 +227,9 @@ class FrameoCLI:
         brightness = result.get("brightness", 0)
         
         print(f"Device Status: {status}")
-        print(f"Brightness: {brightness}/255 ({int(brightness/255*100)}%)")
+        # Some devices report levels above 255, which the table doesn't cover
+        percent = BRIGHTNESS_PERCENT[brightness] if 0 <= brightness <= 255 else brightness * 100 // 255
+        print(f"Brightness: {brightness}/255 ({percent}%)")
     
     def shell(self, command: str):
         """Execute shell command"""
@@ -150,6 +241,15 @@ class FrameoCLI:
         else:
             self._success("Command executed")
     
+    def _run_shell(self, command: str):
+        """Execute shell command for its side effect, without parsing the response"""
+        self._request("POST", "/shell", _shell_body(command), parse_json=False)
+    
+    def batch_shell(self, commands: List[str]) -> List[str]:
+        """Execute several shell commands in one request and return their outputs"""
+        result = self._request("POST", "/batch-shell", {"commands": commands})
+        return result.get("results", [])
+    
     def enable_tcpip(self):
         """Enable wireless debugging"""
         result = self._request("POST", "/tcpip")
@@ -158,12 +258,12 @@ class FrameoCLI:
     
     def wake(self):
         """Wake the device"""
-        self.shell("input keyevent KEYCODE_WAKEUP")
+        self._run_shell("input keyevent KEYCODE_WAKEUP")
         self._success("Device woken up")
     
     def sleep(self):
         """Put device to sleep"""
-        self.shell("input keyevent KEYCODE_SLEEP")
+        self._run_shell("input keyevent KEYCODE_SLEEP")
         self._success("Device sleeping")
     
     def set_brightness(self, level: int):
@@ -172,85 +272,90 @@ class FrameoCLI:
             self._error("Brightness must be between 0 and 255")
             sys.exit(1)
         
-        self.shell(f"settings put system screen_brightness {level}")
-        self._success(f"Brightness set to {level}/255 ({int(level/255*100)}%)")
+        self._run_shell(f"settings put system screen_brightness {level}")
+        self._success(f"Brightness set to {level}/255 ({BRIGHTNESS_PERCENT[level]}%)")
     
     def tap(self, x: int, y: int):
         """Tap at coordinates"""
-        self.shell(f"input tap {x} {y}")
+        self._run_shell(f"input tap {x} {y}")
         self._success(f"Tapped at ({x}, {y})")
     
     def swipe(self, x1: int, y1: int, x2: int, y2: int, duration: int = 300):
         """Swipe gesture"""
-        self.shell(f"input swipe {x1} {y1} {x2} {y2} {duration}")
+        self._run_shell(f"input swipe {x1} {y1} {x2} {y2} {duration}")
         self._success(f"Swiped from ({x1}, {y1}) to ({x2}, {y2})")
     
     def next_photo(self):
         """Swipe to next photo"""
-        self.shell("input swipe 900 500 100 500 300")
+        self._run_shell("input swipe 900 500 100 500 300")
         self._success("Next photo")
     
     def prev_photo(self):
         """Swipe to previous photo"""
-        self.shell("input swipe 100 500 900 500 300")
+        self._run_shell("input swipe 100 500 900 500 300")
         self._success("Previous photo")
     
     def home(self):
         """Press home button"""
-        self.shell("input keyevent KEYCODE_HOME")
+        self._run_shell("input keyevent KEYCODE_HOME")
         self._success("Home button pressed")
     
     def back(self):
         """Press back button"""
-        self.shell("input keyevent KEYCODE_BACK")
+        self._run_shell("input keyevent KEYCODE_BACK")
         self._success("Back button pressed")
     
     def open_app(self):
         """Open Frameo app"""
-        self.shell("am start -n com.frameo.app/.MainActivity")
+        self._run_shell(OPEN_APP_CMD)
         self._success("Frameo app opened")
     
     def restart_app(self):
         """Restart Frameo app"""
-        self.shell("am force-stop com.frameo.app")
         self._info("Stopping app...")
-        import time
-        time.sleep(2)
-        self.shell("am start -n com.frameo.app/.MainActivity")
+        self._run_shell(RESTART_APP_CMD)
         self._success("Frameo app restarted")
     
     def screenshot(self, output: str = "screenshot.png"):
         """Take screenshot"""
-        # Take screenshot on device
-        self.shell("screencap -p /sdcard/screenshot.png")
-        self._info("Screenshot saved on device at /sdcard/screenshot.png")
+        self._info("Taking screenshot...")
+        
+        try:
+            url = self._urls["/screenshot"]
+            response = self.session.get(url, stream=True, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            
+            file_size = self._stream_to_file(response, output)
+            self._success(f"Screenshot saved to {output} ({file_size / 1024:.1f} KB)")
         
-        # Note: Pulling the file requires additional ADB functionality
-        # For now, just inform the user
-        self._info("To retrieve the screenshot, use ADB:")
-        self._info(f"  adb pull /sdcard/screenshot.png {output}")
+        except requests.exceptions.Timeout:
+            self._exit_timeout()
+        except requests.exceptions.ConnectionError:
+            self._error(f"Cannot connect to API at {self.base_url}")
+            sys.exit(1)
+        except requests.exceptions.HTTPError as e:
+            self._exit_http_error(response, e, "Screenshot failed")
+        except Exception as e:
+            self._error(f"Screenshot failed: {e}")
+            sys.exit(1)
     
     def info(self):
         """Display device information"""
         print("Getting device information...\n")
         
-        # Device model
-        result = self._request("POST", "/shell", {"command": "getprop ro.product.model"})
-        print(f"Model: {result.get('result', 'Unknown').strip()}")
-        
-        # Android version
-        result = self._request("POST", "/shell", {"command": "getprop ro.build.version.release"})
-        print(f"Android Version: {result.get('result', 'Unknown').strip()}")
-        
-        # Screen resolution
-        result = self._request("POST", "/shell", {"command": "wm size"})
-        print(f"Resolution: {result.get('result', 'Unknown').strip()}")
-        
-        # Battery level
-        result = self._request("POST", "/shell", {"command": "dumpsys battery | grep level"})
-        battery = result.get('result', '').strip()
-        if battery:
-            print(f"Battery: {battery}")
+        model, android_version, resolution, battery = self.batch_shell([
+            "getprop ro.product.model",
+            "getprop ro.build.version.release",
+            "wm size",
+            # A single sysfs read; fall back to dumpsys on devices without it
+            "cat /sys/class/power_supply/battery/capacity 2>/dev/null || dumpsys battery | grep level",
+        ])
+        print(f"Model: {model.strip() or 'Unknown'}")
+        print(f"Android Version: {android_version.strip() or 'Unknown'}")
+        print(f"Resolution: {resolution.strip() or 'Unknown'}")
+        battery = battery.strip().rpartition(":")[2].strip()
+        if battery.isdigit():
+            print(f"Battery: {int(battery)}%")
         
         # Current state
         print()
@@ -258,43 +363,48 @@ class FrameoCLI:
     
     def upload(self, file_path: str, destination: str = "/sdcard/Frameo"):
         """Upload a file to the device"""
-        if not os.path.exists(file_path):
+        # One stat call covers the existence, file type and size checks
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
             self._error(f"File not found: {file_path}")
             sys.exit(1)
         
-        if not os.path.isfile(file_path):
+        if not stat.S_ISREG(file_stat.st_mode):
             self._error(f"Not a file: {file_path}")
             sys.exit(1)
         
         file_name = os.path.basename(file_path)
-        file_size = os.path.getsize(file_path)
-        file_size_mb = file_size / (1024 * 1024)
+        file_size_mb = file_stat.st_size / (1024 * 1024)
         
         self._info(f"Uploading {file_name} ({file_size_mb:.2f} MB)...")
         
         try:
             with open(file_path, 'rb') as f:
-                files = {'file': (file_name, f)}
-                data = {'destination': destination}
+                file_field = (file_name, f, 'application/octet-stream')
+                url = self._urls["/upload"]
                 
-                url = f"{self.base_url}/upload"
-                response = self.session.post(url, files=files, data=data)
+                if MultipartEncoder:
+                    # Encode the body lazily from the file handle as the socket drains
+                    encoder = MultipartEncoder(fields={'destination': destination, 'file': file_field})
+                    response = self.session.post(url, data=encoder, headers={'Content-Type': encoder.content_type},
+                                                 timeout=TRANSFER_TIMEOUT)
+                else:
+                    response = self.session.post(url, files={'file': file_field}, data={'destination': destination},
+                                                 timeout=TRANSFER_TIMEOUT)
                 response.raise_for_status()
                 
                 result = response.json()
                 self._success(f"File uploaded: {result.get('path')}")
                 self._info("Photo should appear in Frameo shortly")
         
+        except requests.exceptions.Timeout:
+            self._exit_timeout()
         except requests.exceptions.ConnectionError:
             self._error(f"Cannot connect to API at {self.base_url}")
             sys.exit(1)
         except requests.exceptions.HTTPError as e:
-            try:
-                error_data = response.json()
-                self._error(f"Upload failed: {error_data.get('error', str(e))}")
-            except:
-                self._error(f"HTTP Error: {e}")
-            sys.exit(1)
+            self._exit_http_error(response, e, "Upload failed")
         except Exception as e:
             self._error(f"Upload failed: {e}")
             sys.exit(1)
@@ -308,123 +418,151 @@ class FrameoCLI:
         
         try:
             data = {"path": remote_path}
-            url = f"{self.base_url}/download"
-            response = self.session.post(url, json=data)
+            url = self._urls["/download"]
+            response = self.session.post(url, json=data, stream=True, timeout=TRANSFER_TIMEOUT)
             response.raise_for_status()
             
-            with open(output, 'wb') as f:
-                f.write(response.content)
-            
-            file_size = len(response.content)
+            file_size = self._stream_to_file(response, output)
             file_size_mb = file_size / (1024 * 1024)
             self._success(f"Downloaded to {output} ({file_size_mb:.2f} MB)")
         
+        except requests.exceptions.Timeout:
+            self._exit_timeout()
         except requests.exceptions.ConnectionError:
             self._error(f"Cannot connect to API at {self.base_url}")
             sys.exit(1)
         except requests.exceptions.HTTPError as e:
-            try:
-                error_data = response.json()
-                self._error(f"Download failed: {error_data.get('error', str(e))}")
-            except:
-                self._error(f"HTTP Error: {e}")
-            sys.exit(1)
+            self._exit_http_error(response, e, "Download failed")
         except Exception as e:
             self._error(f"Download failed: {e}")
             sys.exit(1)
 
 
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(
+        prog="frameo-cli",
+        description="Command-line interface for Frameo ADB Control API",
+    )
+    parser.add_argument("--host", default=DEFAULT_API_HOST, help="API server host")
+    parser.add_argument("--port", type=int, default=DEFAULT_API_PORT, help="API server port")
+    parser.add_argument("--version", action="version", version=f"Frameo CLI v{VERSION}")
+    commands = parser.add_subparsers(dest="command", metavar="<command>", required=True)
+    
+    connect = commands.add_parser("connect", help="Connect to a device")
+    connect_types = connect.add_subparsers(dest="connection_type", required=True)
+    connect_usb = connect_types.add_parser("usb", help="Connect over USB")
+    connect_usb.add_argument("serial")
+    connect_network = connect_types.add_parser("network", help="Connect over the network")
+    connect_network.add_argument("device_host", metavar="host")
+    connect_network.add_argument("--port", dest="device_port", type=int, default=5555, help="Device ADB port")
+    
+    commands.add_parser("devices", help="List USB devices")
+    commands.add_parser("state", help="Show device state")
+    shell = commands.add_parser("shell", help="Execute a shell command")
+    shell.add_argument("shell_command", metavar="command")
+    commands.add_parser("tcpip", help="Enable wireless debugging")
+    commands.add_parser("wake", help="Wake the device")
+    commands.add_parser("sleep", help="Put the device to sleep")
+    brightness = commands.add_parser("brightness", help="Set screen brightness (0-255)")
+    brightness.add_argument("level", type=int)
+    tap = commands.add_parser("tap", help="Tap at coordinates")
+    tap.add_argument("x", type=int)
+    tap.add_argument("y", type=int)
+    swipe = commands.add_parser("swipe", help="Swipe between two points")
+    for name in ("x1", "y1", "x2", "y2"):
+        swipe.add_argument(name, type=int)
+    swipe.add_argument("--duration", type=int, default=300, help="Swipe duration in milliseconds")
+    commands.add_parser("next", help="Next photo")
+    commands.add_parser("prev", help="Previous photo")
+    commands.add_parser("home", help="Press home button")
+    commands.add_parser("back", help="Press back button")
+    commands.add_parser("open-app", help="Open Frameo app")
+    commands.add_parser("restart-app", help="Restart Frameo app")
+    screenshot = commands.add_parser("screenshot", help="Take a screenshot")
+    screenshot.add_argument("--output", default="screenshot.png", help="Output file path")
+    upload = commands.add_parser("upload", help="Upload a file to the device")
+    upload.add_argument("file")
+    upload.add_argument("--destination", default="/sdcard/Frameo", help="Destination directory on device")
+    download = commands.add_parser("download", help="Download a file from the device")
+    download.add_argument("remote_path", metavar="remote-path")
+    download.add_argument("--output", help="Output file path")
+    commands.add_parser("info", help="Show device information")
+    batch = commands.add_parser("batch", help="Run a JSON list of commands in one session")
+    batch.add_argument("script", help='JSON file of [{"cmd": ..., "args": [...]}] steps, or - for stdin')
+    return parser
+
+
+# Built once at import so repeated invocations in scripts only pay for parsing argv
+PARSER = _build_parser()
+
+# Maps each subcommand to the FrameoCLI call that handles it
+COMMANDS = {
+    # Device discovery and connection
+    "devices": lambda cli, args: cli.get_usb_devices(),
+    "connect": lambda cli, args: (
+        cli.connect_usb(args.serial) if args.connection_type == "usb"
+        else cli.connect_network(args.device_host, args.device_port)
+    ),
+    "state": lambda cli, args: cli.get_state(),
+    "shell": lambda cli, args: cli.shell(args.shell_command),
+    "tcpip": lambda cli, args: cli.enable_tcpip(),
+    # Power and brightness
+    "wake": lambda cli, args: cli.wake(),
+    "sleep": lambda cli, args: cli.sleep(),
+    "brightness": lambda cli, args: cli.set_brightness(args.level),
+    # Touch input and navigation
+    "tap": lambda cli, args: cli.tap(args.x, args.y),
+    "swipe": lambda cli, args: cli.swipe(args.x1, args.y1, args.x2, args.y2, args.duration),
+    "next": lambda cli, args: cli.next_photo(),
+    "prev": lambda cli, args: cli.prev_photo(),
+    "home": lambda cli, args: cli.home(),
+    "back": lambda cli, args: cli.back(),
+    # App control
+    "open-app": lambda cli, args: cli.open_app(),
+    "restart-app": lambda cli, args: cli.restart_app(),
+    # Screenshots, file transfer and info
+    "screenshot": lambda cli, args: cli.screenshot(args.output),
+    "upload": lambda cli, args: cli.upload(args.file, args.destination),
+    "download": lambda cli, args: cli.download(args.remote_path, args.output),
+    "info": lambda cli, args: cli.info(),
+    "batch": lambda cli, args: _run_batch(cli, args.script),
+}
+
+
+def _run_batch(cli: FrameoCLI, script: str):
+    """Run scripted commands in order, reusing one session and its kept-alive connection"""
+    if script == "-":
+        steps = json.load(sys.stdin)
+    else:
+        with open(script) as f:
+            steps = json.load(f)
+    if not isinstance(steps, list) or not all(
+            isinstance(step, dict) and isinstance(step.get("args", []), list) for step in steps):
+        cli._error('Batch script must be a JSON list of {"cmd": ..., "args": [...]} objects')
+        sys.exit(1)
+    
+    # Parse every step like a command line before running any, so a bad step
+    # fails the whole script instead of stopping it halfway through
+    parsed = [PARSER.parse_args([str(step.get("cmd", ""))] + [str(arg) for arg in step.get("args", [])])
+              for step in steps]
+    if any(args.command == "batch" for args in parsed):
+        cli._error("Batch scripts cannot run other batch scripts")
+        sys.exit(1)
+    
+    for args in parsed:
+        COMMANDS[args.command](cli, args)
+
+
 def main():
     """Main CLI entry point"""
-    args = docopt(__doc__, version=f"Frameo CLI v{VERSION}")
-    
-    # Parse global options
-    host = args.get("--host", DEFAULT_API_HOST)
-    port = int(args.get("--port", DEFAULT_API_PORT))
+    args = PARSER.parse_args()
     
     # Initialize CLI
-    cli = FrameoCLI(host=host, port=port)
+    cli = FrameoCLI(host=args.host, port=args.port)
     
     try:
-        # Device discovery
-        if args["devices"]:
-            cli.get_usb_devices()
-        
-        # Connection
-        elif args["connect"]:
-            if args["usb"]:
-                cli.connect_usb(args["<serial>"])
-            elif args["network"]:
-                port = int(args.get("--port") or 5555)
-                cli.connect_network(args["<host>"], port)
-        
-        # State
-        elif args["state"]:
-            cli.get_state()
-        
-        # Shell command
-        elif args["shell"]:
-            cli.shell(args["<command>"])
-        
-        # TCP/IP
-        elif args["tcpip"]:
-            cli.enable_tcpip()
-        
-        # Power control
-        elif args["wake"]:
-            cli.wake()
-        elif args["sleep"]:
-            cli.sleep()
-        
-        # Brightness
-        elif args["brightness"]:
-            cli.set_brightness(int(args["<level>"]))
-        
-        # Touch input
-        elif args["tap"]:
-            cli.tap(int(args["<x>"]), int(args["<y>"]))
-        elif args["swipe"]:
-            duration = int(args.get("--duration") or 300)
-            cli.swipe(
-                int(args["<x1>"]),
-                int(args["<y1>"]),
-                int(args["<x2>"]),
-                int(args["<y2>"]),
-                duration
-            )
-        
-        # Navigation shortcuts
-        elif args["next"]:
-            cli.next_photo()
-        elif args["prev"]:
-            cli.prev_photo()
-        elif args["home"]:
-            cli.home()
-        elif args["back"]:
-            cli.back()
-        
-        # App control
-        elif args["open-app"]:
-            cli.open_app()
-        elif args["restart-app"]:
-            cli.restart_app()
-        
-        # Screenshot
-        elif args["screenshot"]:
-            output = args.get("--output") or "screenshot.png"
-            cli.screenshot(output)
-        
-        # File transfer
-        elif args["upload"]:
-            destination = args.get("--destination") or "/sdcard/Frameo"
-            cli.upload(args["<file>"], destination)
-        elif args["download"]:
-            output = args.get("--output")
-            cli.download(args["<remote-path>"], output)
-        
-        # Device info
-        elif args["info"]:
-            cli.info()
+        COMMANDS[args.command](cli, args)
     
     except KeyboardInterrupt:
         print("\nAborted by user")